@@ -1,28 +1,182 @@
 
-from re import findall
+import hashlib
+import os
+import re
+from array import array
 
-def extract_and_append_unique_configs(input_path="RawText.txt", output_path="Final_Configs.txt"):
-    with open(input_path, "r", encoding="utf-8") as f:
-        full = f.read()
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+_CONFIG_RE = re.compile(r"(?:vless|trojan|ss)://[^\s#]+")
+
+# Optional Hyperscan matcher for the same pattern. Hyperscan reports every
+# possible match end, so the expression also consumes the terminating
+# character (or end of data) to get exactly one match per link. Python's \s
+# also covers \x1c-\x1f, which Hyperscan's UCP \s does not.
+_CONFIG_HS = None
+if hyperscan is not None:
+    _CONFIG_HS = hyperscan.Database()
+    _CONFIG_HS.compile(
+        expressions=[rb"(?:vless|trojan|ss)://[^\s\x1c-\x1f#]+(?:[\s\x1c-\x1f#]|\z)"],
+        ids=[0],
+        elements=1,
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP],
+    )
+
+
+def _find_configs(text):
+    if _CONFIG_HS is None:
+        return _CONFIG_RE.findall(text)
+
+    spans = []
+
+    def on_match(_id, start, end, _flags, _context):
+        spans.append((start, end))
+
+    data = text.encode("utf-8")
+    _CONFIG_HS.scan(data, match_event_handler=on_match)
+
+    links = []
+    last_end = 0
+    for start, end in sorted(spans):
+        if start < last_end:
+            continue
+        last_end = end
+        link = data[start:end].decode("utf-8")
+        if link[-1] == "#" or link[-1].isspace():
+            link = link[:-1]
+        links.append(link)
+    return links
+
+
+def _digest(link):
+    # 64-bit BLAKE2b fingerprint; stable across runs unlike hash().
+    return int.from_bytes(hashlib.blake2b(link.encode("utf-8"), digest_size=8).digest(), "little")
 
-    pattern = r"(?:vless|trojan|ss)://[^\s#]+"
-    links = findall(pattern, full)
 
+def _index_path(output_path):
+    return os.path.splitext(output_path)[0] + ".idx"
+
+
+def _write_index(output_path, digests, append):
+    """
+    Writes digests to the .idx sidecar of output_path.
+
+    Layout: output_path's size and mtime_ns (two 8-byte words) followed by
+    the digests. The header is written last, so an interrupted update leaves
+    a mismatching header and the index is rebuilt on the next load.
+    """
+    index_path = _index_path(output_path)
+    st = os.stat(output_path)
+    header = array("Q", [st.st_size, st.st_mtime_ns])
+    if append and os.path.exists(index_path):
+        with open(index_path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            array("Q", digests).tofile(f)
+            f.seek(0)
+            header.tofile(f)
+    else:
+        with open(index_path, "wb") as f:
+            array("Q", [0, 0]).tofile(f)
+            array("Q", digests).tofile(f)
+            f.seek(0)
+            header.tofile(f)
+
+
+def _load_seen(output_path):
+    """
+    Returns the set of digests of configs already in output_path.
+
+    The digests are kept in a sidecar .idx file (8 bytes per config) so the
+    growing output file does not have to be re-read every run. The index is
+    rebuilt from output_path when it is missing, corrupt, or was written for
+    a different size or mtime of output_path (e.g. after a manual edit or a
+    restore from backup).
+    """
+    index_path = _index_path(output_path)
     try:
-        with open(output_path, "r", encoding="utf-8") as f:
-            existing = set(line.strip() for line in f if line.strip())
+        st = os.stat(output_path)
     except FileNotFoundError:
-        existing = set()
+        # Fresh output file: a leftover index would describe configs that are gone.
+        try:
+            os.remove(index_path)
+        except FileNotFoundError:
+            pass
+        return set()
+
+    try:
+        with open(index_path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        data = b""
+    if len(data) >= 16 and len(data) % 8 == 0:
+        words = array("Q")
+        words.frombytes(data)
+        if words[0] == st.st_size and words[1] == st.st_mtime_ns:
+            return set(words[2:])
+
+    with open(output_path, "rb") as f:
+        data = f.read()
+    seen = {_digest(line) for line in map(str.strip, data.decode("utf-8", "replace").splitlines()) if line}
+    _write_index(output_path, seen, append=False)
+    return seen
+
+
+def _append_unique(links, output_path):
+    seen = _load_seen(output_path)
+
+    # dict.fromkeys drops repeated links in one pass while keeping first-seen order.
+    new_links = []
+    new_digests = []
+    for link in dict.fromkeys(links):
+        h = _digest(link)
+        if h not in seen:
+            seen.add(h)
+            new_links.append(link)
+            new_digests.append(h)
+
+    # One encoded buffer appended on a raw fd; O_CREAT keeps the file present
+    # for remove_duplicate_configs even when nothing is new.
+    payload = memoryview(("\n".join(new_links) + "\n").encode("utf-8") if new_links else b"")
+    fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        while payload:
+            payload = payload[os.write(fd, payload):]
+    finally:
+        os.close(fd)
+    _write_index(output_path, new_digests, append=True)
+
+    return len(new_links), len(seen)
+
+
+def extract_and_append_unique_configs(input_path="RawText.txt", output_path="Final_Configs.txt"):
+    # Config links never contain whitespace, so they cannot span lines.
+    links = []
+    with open(input_path, "r", encoding="utf-8", buffering=1 << 20) as f:
+        for line in f:
+            links.extend(_find_configs(line))
+
+    return _append_unique(links, output_path)
+
+
+def extract_configs_from_messages(messages, output_path="Final_Configs.txt"):
+    """
+    Same as extract_and_append_unique_configs, but scans collected messages
+    in memory instead of re-reading them from RawText.txt.
+
+    Args:
+        messages: Iterable of records with a .text attribute (main.MsgRec)
+        output_path: Path of the file new configs are appended to
+    """
+    links = []
+    for m in messages:
+        links.extend(_find_configs(m.text))
+
+    return _append_unique(links, output_path)
 
-    new_count = 0
-    with open(output_path, "a", encoding="utf-8") as f:
-        for link in links:
-            if link not in existing:
-                f.write(link + "\n")
-                existing.add(link)
-                new_count += 1
 
-    return new_count, len(existing)
 def remove_duplicate_configs(input_file, output_file):
     """
     Reads configuration file, removes duplicates, and saves unique configurations.
@@ -32,19 +186,17 @@ def remove_duplicate_configs(input_file, output_file):
         output_file: Path to save the output file
     """
     
-    with open(input_file, 'r') as file:
-        lines = file.readlines()
-    
-    clean_lines = [line.strip() for line in lines if line.strip()]
+    with open(input_file, 'rb') as file:
+        lines = file.read().decode('utf-8', 'replace').splitlines()
     
-    unique_configs = set()
+    clean_lines = [line for line in map(str.strip, lines) if line]
     
-    for config in clean_lines:
-        unique_configs.add(config)
+    # dict.fromkeys keeps the first occurrence of each config in file order.
+    unique_configs = list(dict.fromkeys(clean_lines))
     
-    with open(output_file, 'w') as file:
-        for config in unique_configs:
-            file.write(config + '\n')
+    with open(output_file, 'w', encoding='utf-8') as file:
+        if unique_configs:
+            file.write('\n'.join(unique_configs) + '\n')
     
     print(f"Original configurations: {len(clean_lines)}")
     print(f"Unique configurations: {len(unique_configs)}")
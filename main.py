@@ -9,11 +9,38 @@ from telethon import TelegramClient
 from telethon.errors import FloodWaitError, SessionPasswordNeededError
 from telethon.tl.types import MessageEntityTextUrl, MessageEntityUrl
 
-from checker import extract_and_append_unique_configs , remove_duplicate_configs
+try:
+    import uvloop  # optional, faster event loop
+except ImportError:
+    uvloop = None
+
+try:
+    import ahocorasick  # optional, pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson  # optional, faster JSON
+except ImportError:
+    orjson = None
+
+from checker import extract_configs_from_messages, remove_duplicate_configs
 
 logger = logging.getLogger("tg_config_collector")
 
 
+class MsgRec:
+    # Plain __slots__ class (dataclass(slots=True) needs Python 3.10+).
+    __slots__ = ("chat_id", "chat_name", "msg_id", "date_utc", "text")
+
+    def __init__(self, chat_id: int, chat_name: str, msg_id: int, date_utc: str, text: str):
+        self.chat_id = chat_id
+        self.chat_name = chat_name
+        self.msg_id = msg_id
+        self.date_utc = date_utc
+        self.text = text
+
+
 # ----------------------------
 # Logging
 # ----------------------------
@@ -38,10 +65,24 @@ def setup_logging(debug: bool):
 # ----------------------------
 # Config
 # ----------------------------
+def read_json(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def write_json(path, obj):
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+
+
 def load_config(path="configuration.json"):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            cfg = json.load(f)
+        cfg = read_json(path)
 
         for k in ["API_ID", "API_HASH", "SESSION_NAME"]:
             if k not in cfg:
@@ -69,15 +110,19 @@ def get_last_24h_range_utc():
 # Message text extraction
 # ----------------------------
 def extract_text_with_urls(msg) -> str:
-    base = msg.message or ""
-    if msg.entities and msg.message:
+    if not msg.message:
+        return ""
+    parts = [msg.message]
+    if msg.entities:
+        text = msg.message
+        # Telethon TL types are leaf classes, so an exact type check is enough.
         for ent in msg.entities:
-            if isinstance(ent, MessageEntityTextUrl):
-                base += f"\n{ent.url}"
-            elif isinstance(ent, MessageEntityUrl):
-                url = msg.message[ent.offset: ent.offset + ent.length]
-                base += f"\n{url}"
-    return base.strip()
+            t = type(ent)
+            if t is MessageEntityTextUrl:
+                parts.append(ent.url)
+            elif t is MessageEntityUrl:
+                parts.append(text[ent.offset: ent.offset + ent.length])
+    return "\n".join(parts).strip()
 
 
 # ----------------------------
@@ -102,6 +147,39 @@ async def list_dialogs(client: TelegramClient, limit: int = 50):
 # ----------------------------
 # Chat selection (NO LIMIT using iter_dialogs)
 # ----------------------------
+_KEYWORDS = (
+    "v2ray", "proxy", "config", "vpn", "server",
+    "vmess", "vless", "trojan", "shadowsocks",
+    "mtproto", "outline", "network"
+)
+
+
+def _keyword_matcher(keywords):
+    """
+    Returns a predicate telling whether a lowercased name contains any keyword.
+    Empty keywords => accept everything. Uses one Aho-Corasick pass per name
+    when pyahocorasick is installed, plain substring checks otherwise.
+    """
+    if not keywords:
+        return lambda name: True
+
+    # Names are lowercased by the caller; lowercase keywords once here to match.
+    kws = tuple(k.lower() for k in keywords)
+
+    if ahocorasick is None:
+        return lambda name: any(k in name for k in kws)
+
+    # "" is in every name, but the automaton silently drops empty words.
+    if any(not k for k in kws):
+        return lambda name: True
+
+    automaton = ahocorasick.Automaton()
+    for k in kws:
+        automaton.add_word(k, k)
+    automaton.make_automaton()
+    return lambda name: next(automaton.iter(name), None) is not None
+
+
 async def select_relevant_chats(
     client: TelegramClient,
     include_users: bool = False,
@@ -116,11 +194,8 @@ async def select_relevant_chats(
     - max_chats=0 => no limit
     """
     if keywords is None:
-        keywords = [
-            "v2ray", "proxy", "config", "vpn", "server",
-            "vmess", "vless", "trojan", "shadowsocks",
-            "mtproto", "outline", "network"
-        ]
+        keywords = _KEYWORDS
+    matches = _keyword_matcher(keywords)
 
     chosen_ids = []
     matched = 0
@@ -135,13 +210,13 @@ async def select_relevant_chats(
         if title:
             # Channel/Group
             t = title.lower()
-            ok = any(k in t for k in keywords) if keywords else True
+            ok = matches(t)
         else:
             # User/private chat
             if not include_users:
                 continue
             name = (getattr(ent, "first_name", "") + " " + (getattr(ent, "last_name", "") or "")).strip().lower()
-            ok = any(k in name for k in keywords) if keywords else True
+            ok = matches(name)
 
         if not ok:
             continue
@@ -156,8 +231,7 @@ async def select_relevant_chats(
 
     if save_path:
         try:
-            with open(save_path, "w", encoding="utf-8") as f:
-                json.dump(chosen_ids, f, ensure_ascii=False, indent=2)
+            write_json(save_path, chosen_ids)
             logger.info("Saved selected chats to %s", save_path)
         except Exception as e:
             logger.warning("Could not save selected chats: %s", e)
@@ -167,8 +241,7 @@ async def select_relevant_chats(
 
 def load_saved_chats(path="selected_chats.json"):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            chat_ids = json.load(f)
+        chat_ids = read_json(path)
         if not isinstance(chat_ids, list):
             raise ValueError("selected_chats.json must be a list")
         return chat_ids
@@ -182,6 +255,10 @@ def load_saved_chats(path="selected_chats.json"):
 # ----------------------------
 # Message collection (NO LIMIT, stop by time)
 # ----------------------------
+# chat_id -> (entity, chat_name); saves a get_entity round-trip on repeat calls in this process
+_ENTITY_CACHE: dict = {}
+
+
 async def collect_messages_from_chat(
     client: TelegramClient,
     chat_id,
@@ -189,14 +266,20 @@ async def collect_messages_from_chat(
     end_utc: datetime,
     debug_sample: bool = False,
 ):
-    entity = await client.get_entity(chat_id)
-    chat_name = getattr(entity, "title", None) or getattr(entity, "first_name", "Unknown")
+    cached = _ENTITY_CACHE.get(chat_id)
+    if cached is None:
+        entity = await client.get_entity(chat_id)
+        chat_name = getattr(entity, "title", None) or getattr(entity, "first_name", "Unknown")
+        _ENTITY_CACHE[chat_id] = (entity, chat_name)
+    else:
+        entity, chat_name = cached
 
     collected = []
 
     try:
         # limit=None => NO LIMIT. We stop when msg_time < start_utc
-        async for msg in client.iter_messages(entity, limit=None):
+        # offset_date=end_utc => server starts at the newest message before end_utc
+        async for msg in client.iter_messages(entity, limit=None, offset_date=end_utc):
             if not msg.date:
                 continue
 
@@ -212,13 +295,7 @@ async def collect_messages_from_chat(
             if start_utc <= msg_time < end_utc:
                 text = extract_text_with_urls(msg)
                 if text:
-                    collected.append({
-                        "chat_id": chat_id,
-                        "chat_name": chat_name,
-                        "msg_id": msg.id,
-                        "date_utc": msg_time.isoformat(),
-                        "text": text
-                    })
+                    collected.append(MsgRec(chat_id, chat_name, msg.id, msg_time.isoformat(), text))
 
         return collected, chat_name
 
@@ -236,23 +313,34 @@ async def collect_messages(
     end_utc: datetime,
     delay_between_chats: float = 0.0,
     debug_sample: bool = False,
+    concurrency: int = 5,
 ):
-    all_msgs = []
-
-    for i, chat_id in enumerate(chat_ids, 1):
-        try:
-            msgs, cname = await collect_messages_from_chat(
-                client, chat_id, start_utc, end_utc, debug_sample=debug_sample
-            )
-            logger.info("Chat %d/%d: %s -> %d messages in range", i, len(chat_ids), cname, len(msgs))
-            all_msgs.extend(msgs)
-
-        except Exception as e:
-            logger.error("Error collecting from chat_id=%s: %s", chat_id, e)
-
-        if i < len(chat_ids) and delay_between_chats and delay_between_chats > 0:
-            await asyncio.sleep(delay_between_chats)
+    # Chats are fetched concurrently; the semaphore bounds in-flight requests.
+    # FloodWait is handled per chat in collect_messages_from_chat, so one
+    # rate-limited chat only holds its own slot.
+    sem = asyncio.Semaphore(max(1, concurrency))
+    total = len(chat_ids)
+
+    async def _one(i, chat_id):
+        async with sem:
+            try:
+                msgs, cname = await collect_messages_from_chat(
+                    client, chat_id, start_utc, end_utc, debug_sample=debug_sample
+                )
+                logger.info("Chat %d/%d: %s -> %d messages in range", i, total, cname, len(msgs))
+            except Exception as e:
+                logger.error("Error collecting from chat_id=%s: %s", chat_id, e)
+                msgs = []
+
+            if i < total and delay_between_chats and delay_between_chats > 0:
+                await asyncio.sleep(delay_between_chats)
+            return msgs
+
+    results = await asyncio.gather(*(_one(i, chat_id) for i, chat_id in enumerate(chat_ids, 1)))
 
+    all_msgs = []
+    for msgs in results:
+        all_msgs.extend(msgs)
     return all_msgs
 
 
@@ -260,27 +348,33 @@ async def collect_messages(
 # Output files
 # ----------------------------
 def write_raw_text(messages, raw_path="RawText.txt", report_path="Telegram_output.txt", dry_run=False):
+    # raw_path=None => skip RawText.txt (configs are extracted from memory).
     if dry_run:
         logger.info("[DRY RUN] Skipping file writes.")
         return
 
-    with open(raw_path, "w", encoding="utf-8") as f:
-        for m in messages:
-            f.write(m["text"])
-            f.write("\n\n")
-
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write("=== Message Report ===\n")
-        f.write(f"Generated (UTC): {datetime.now(timezone.utc).isoformat()}\n")
-        f.write(f"Messages: {len(messages)}\n")
-        f.write("=" * 70 + "\n\n")
-        for m in messages:
-            f.write(f"Chat: {m['chat_name']} | chat_id={m['chat_id']}\n")
-            f.write(f"Message ID: {m['msg_id']}\n")
-            f.write(f"Date (UTC): {m['date_utc']}\n")
-            f.write("Content:\n")
-            f.write(m["text"] + "\n")
-            f.write("=" * 70 + "\n\n")
+    if raw_path:
+        with open(raw_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            f.write("".join(f"{m.text}\n\n" for m in messages))
+
+    sep = "=" * 70
+    parts = [
+        "=== Message Report ===\n",
+        f"Generated (UTC): {datetime.now(timezone.utc).isoformat()}\n",
+        f"Messages: {len(messages)}\n",
+        f"{sep}\n\n",
+    ]
+    for m in messages:
+        parts.append(
+            f"Chat: {m.chat_name} | chat_id={m.chat_id}\n"
+            f"Message ID: {m.msg_id}\n"
+            f"Date (UTC): {m.date_utc}\n"
+            "Content:\n"
+            f"{m.text}\n"
+            f"{sep}\n\n"
+        )
+    with open(report_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write("".join(parts))
 
 
 # ----------------------------
@@ -346,18 +440,26 @@ async def async_main(args):
             start_utc,
             end_utc,
             delay_between_chats=args.delay,
-            debug_sample=args.debug_sample
+            debug_sample=args.debug_sample,
+            concurrency=args.concurrency,
         )
 
         logger.info("Collected total %d messages in range.", len(messages))
 
-        write_raw_text(messages, raw_path="RawText.txt", report_path="Telegram_output.txt", dry_run=args.dry_run)
+        # Plain sync writes are fastest; run them in a thread so the event loop is not blocked.
+        await asyncio.to_thread(
+            write_raw_text,
+            messages,
+            raw_path="RawText.txt" if args.debug else None,
+            report_path="Telegram_output.txt",
+            dry_run=args.dry_run
+        )
 
         if args.dry_run:
             logger.info("[DRY RUN] Skipping .")
             return
 
-        new_count, total = extract_and_append_unique_configs("RawText.txt", "Final_Configs.txt")
+        new_count, total = extract_configs_from_messages(messages, "Final_Configs.txt")
         logger.info("Checker done. New configs added=%d | Total unique=%d", new_count, total)
         remove_duplicate_configs("Final_Configs.txt","Configs.txt")
         
@@ -391,7 +493,10 @@ def build_arg_parser():
                   help="Cache file path.")
 
     # PERFORMANCE / DEBUG
-    p.add_argument("--delay", type=float, default=0.0, help="Delay between chats (seconds).")
+    p.add_argument("--delay", type=float, default=0.0,
+                  help="Delay after each chat, per concurrent slot (seconds).")
+    p.add_argument("--concurrency", type=int, default=5,
+                  help="Number of chats fetched in parallel (1 = sequential).")
     p.add_argument("--debug-sample", action="store_true",
                   help="Log each message timestamp during iteration (very verbose).")
     return p
@@ -420,6 +525,13 @@ if __name__ == "__main__":
         return await _orig_select(client, include_users=include_users, keywords=keywords, max_chats=max_chats, save_path=save_path)
 
     try:
-        asyncio.run(async_main(args))
+        if uvloop is None:
+            asyncio.run(async_main(args))
+        elif hasattr(uvloop, "run"):
+            uvloop.run(async_main(args))
+        else:
+            # uvloop<0.18 has no uvloop.run; install its loop policy instead
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            asyncio.run(async_main(args))
     except KeyboardInterrupt:
         logger.warning("Interrupted by user.")